@@ -0,0 +1,390 @@
+import asyncio
+import os
+from protocol import *
+from diskio import WriteBehind, DURABILITY_EOF
+
+# =======================================
+#  Config
+# =======================================
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+CLIENT_DIR  = "client/"   # folder of client files to upload/download
+DURABILITY  = DURABILITY_EOF   # when downloaded files are fsynced (none / eof / periodic)
+WRITE_BACKOFF     = 0.001   # first wait (seconds) for room in the write queue
+WRITE_BACKOFF_MAX = 0.05    # cap for the doubling wait
+
+
+# =======================================
+#  Datagram Protocol
+# =======================================
+
+class ClientProtocol(asyncio.DatagramProtocol):
+    """
+    One UDP endpoint per session.
+    Incoming packets are parsed and queued so the session
+    coroutines can await them with a timer instead of a blocking socket.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self.packets = asyncio.Queue()
+        self.closed = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            self.packets.put_nowait(parse_packet(data))
+        except ValueError:
+            print(f"[UNEXPECTED] Malformed packet from {addr}, dropped")
+
+    def error_received(self, exc):
+        print(f"[ERROR] Socket error: {exc}")
+
+    def connection_lost(self, exc):
+        if not self.closed.done():
+            self.closed.set_result(exc)
+
+
+class Session:
+    """An asyncio client session: handshake, any number of GET/PUT, teardown."""
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, timeout=TIMEOUT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.transport = None
+        self.protocol = None
+        self.seq = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def send(self, packet):
+        self.transport.sendto(packet)
+
+    async def recv(self, timeout=None):
+        """Wait for the next packet. Raises asyncio.TimeoutError."""
+        return await asyncio.wait_for(self.protocol.packets.get(), timeout or self.timeout)
+
+    async def expect(self, accept):
+        """
+        Wait for the next packet that accept(packet) says belongs to the current step.
+        Anything else (e.g. a duplicate SYN-ACK or a stale ACK) is dropped
+        without resending. Raises asyncio.TimeoutError after self.timeout.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            packet = await self.recv(remaining)
+            if accept(packet):
+                return packet
+            print(f"[UNEXPECTED] Ignored {packet['type']} packet")
+
+    # =======================================
+    #  Handshake
+    # =======================================
+
+    async def connect(self):
+        """
+        Open the endpoint and perform the 3-way handshake.
+        Returns ISN on success, None on failure.
+        """
+        loop = asyncio.get_running_loop()
+        self.transport, self.protocol = await loop.create_datagram_endpoint(
+            ClientProtocol, remote_addr=(self.host, self.port))
+
+        isn = generate_isn()
+
+        for attempt in range(1, MAX_RETRIES + 1):
+            self.send(build_syn(isn))
+            print(f"[SYN] Sent ISN={isn} (attempt {attempt})")
+
+            try:
+                syn_ack_pkt = await self.expect(lambda p: p["type"] in (SYN_ACK, ERROR))
+
+                if syn_ack_pkt["type"] == ERROR:
+                    print(f"[ERROR] Server responded: error_type={syn_ack_pkt['error_type']}, retrying...")
+                    continue
+
+                if syn_ack_pkt["type"] == SYN_ACK:
+                    print(f"[SYN-ACK] Received SEQ={syn_ack_pkt['seq']}, sending ACK...")
+                    self.send(build_ack(syn_ack_pkt["seq"]))
+                    print(f"[ACK] Sent, session established!")
+                    self.seq = isn
+                    return isn
+
+            except asyncio.TimeoutError:
+                print(f"[TIMEOUT] No response from server (attempt {attempt})")
+
+        print("[FAIL] Handshake failed after max retries.")
+        return None
+
+    # =======================================
+    #  Download (GET)
+    # =======================================
+
+    async def download(self, filename):
+        """
+        Request and receive a file from the server.
+        Saves to CLIENT_DIR.
+        Returns updated seq on success, None on failure.
+        """
+        seq = self.seq
+
+        self.send(build_request_get(filename))
+        print(f"[REQUEST] GET {filename}")
+
+        # Wait for ACK (filesize, OK) or ERROR
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                filesize_pkt = await self.expect(
+                    lambda p: p["type"] == ERROR or (p["type"] == ACK and p["subtype"] == "filesize"))
+
+                if filesize_pkt["type"] == ERROR:
+                    if filesize_pkt["error_type"] == ERR_NOT_FOUND:
+                        print(f"[ERROR] File not found on server.")
+                    else:
+                        print(f"[ERROR] Server error type={filesize_pkt['error_type']}")
+                    return None
+
+                if filesize_pkt["type"] == ACK and filesize_pkt["subtype"] == "filesize":
+                    print(f"[ACK] Server confirmed file size={filesize_pkt['filesize']} bytes")
+                    break
+
+            except asyncio.TimeoutError:
+                print(f"[TIMEOUT] Waiting for server response (attempt {attempt})")
+                self.send(build_request_get(filename))
+        else:
+            print("[FAIL] No response from server for GET request.")
+            return None
+
+        # Send ACK (ready) — triple handshake
+        self.send(build_ack(seq))
+        print(f"[ACK] Sent ready, starting download...")
+
+        # Disk writes run on the write-behind thread. Opening, finishing and
+        # aborting block, so they go through the executor; chunks are queued
+        # without blocking so other sessions on the loop keep running
+        loop = asyncio.get_running_loop()
+        save_path = os.path.join(CLIENT_DIR, filename)
+        writer = await loop.run_in_executor(None, WriteBehind, save_path, DURABILITY)
+        expected_seq = seq + 1
+
+        try:
+            while True:
+                for attempt in range(1, MAX_RETRIES + 1):
+                    try:
+                        data_pkt = await self.expect(lambda p: p["type"] in (DATA, ERROR))
+
+                        if data_pkt["type"] == ERROR:
+                            print(f"[ERROR] Received error_type={data_pkt['error_type']} during transfer")
+                            return None
+
+                        if data_pkt["type"] == DATA:
+                            seq = data_pkt["seq"]
+                            eof = data_pkt["eof"]
+                            payload = data_pkt["payload"]
+
+                            if seq != expected_seq:
+                                print(f"[UNEXPECTED] Expected seq={expected_seq}, got seq={seq}")
+                                self.send(build_error(ERR_UNEXPECTED))
+                                continue
+
+                            print(f"[DATA] Received seq={seq} EOF={eof} size={len(payload)} bytes")
+                            try:
+                                # only waits (holding the ACK) if the disk falls behind
+                                delay = WRITE_BACKOFF
+                                while not writer.try_put(payload):
+                                    await asyncio.sleep(delay)
+                                    delay = min(delay * 2, WRITE_BACKOFF_MAX)
+                            except OSError as e:
+                                print(f"[ERROR] Could not write {save_path}: {e}")
+                                return None
+
+                            self.send(build_ack(seq))
+                            print(f"[ACK] Sent seq={seq}")
+
+                            expected_seq += 1
+                            if eof == EOF_LAST:
+                                print(f"[EOF] Last packet received, saving file...")
+                                try:
+                                    await loop.run_in_executor(None, writer.finish)
+                                except OSError as e:
+                                    print(f"[ERROR] Could not write {save_path}: {e}")
+                                    return None
+                                print(f"[DONE] File saved to {save_path}")
+                                self.seq = expected_seq
+                                return expected_seq
+
+                            break
+
+                    except asyncio.TimeoutError:
+                        print(f"[TIMEOUT] Waiting for DATA seq={expected_seq} (attempt {attempt})")
+                else:
+                    print(f"[FAIL] Max retries reached waiting for seq={expected_seq}")
+                    return None
+        finally:
+            # no-op after finish(); cleans up on any other exit, including cancellation
+            await loop.run_in_executor(None, writer.abort)
+
+    # =======================================
+    #  Upload (PUT)
+    # =======================================
+
+    async def upload(self, filename):
+        """
+        Send a file to the server.
+        Reads from CLIENT_DIR.
+        Returns updated seq on success, None on failure.
+        """
+        seq = self.seq
+        filepath = os.path.join(CLIENT_DIR, filename)
+
+        if not os.path.exists(filepath):
+            print(f"[ERROR] File '{filename}' not found in {CLIENT_DIR}")
+            return None
+
+        filesize = os.path.getsize(filepath)
+
+        self.send(build_request_put(filename, filesize))
+        print(f"[REQUEST] PUT {filename} size={filesize}")
+
+        # Wait for ACK (filesize, OK) or ERROR
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                ready_pkt = await self.expect(
+                    lambda p: p["type"] == ERROR or (p["type"] == ACK and p["subtype"] == "filesize"))
+
+                if ready_pkt["type"] == ERROR:
+                    print(f"[ERROR] Server denied upload: error_type={ready_pkt['error_type']}")
+                    return None
+
+                if ready_pkt["type"] == ACK and ready_pkt["subtype"] == "filesize":
+                    print(f"[ACK] Server ready, confirmed size={ready_pkt['filesize']}")
+                    break
+
+            except asyncio.TimeoutError:
+                print(f"[TIMEOUT] Waiting for server response (attempt {attempt})")
+                self.send(build_request_put(filename, filesize))
+        else:
+            print("[FAIL] No response from server for PUT request.")
+            return None
+
+        # Send ACK (ready) — triple handshake
+        self.send(build_ack(seq))
+        print(f"[ACK] Sent ready, starting upload...")
+
+        with open(filepath, "rb") as f:
+            chunk = f.read(CHUNK_SIZE)
+            while chunk:
+                next_chunk = f.read(CHUNK_SIZE)
+                eof = EOF_LAST if not next_chunk else EOF_MORE
+
+                for attempt in range(1, MAX_RETRIES + 1):
+                    self.send(build_data(seq, chunk, eof=eof))
+                    print(f"[DATA] Sent seq={seq} EOF={eof} size={len(chunk)} bytes (attempt {attempt})")
+
+                    try:
+                        ack_pkt = await self.expect(
+                            lambda p: p["type"] == ERROR or (p["type"] == ACK and p.get("ack") == seq + 1))
+
+                        if ack_pkt["type"] == ACK:
+                            print(f"[ACK] Received seq={seq}")
+                            seq += 1
+                            break
+
+                        if ack_pkt["type"] == ERROR:
+                            print(f"[ERROR] Received error_type={ack_pkt['error_type']} during upload")
+                            return None
+
+                    except asyncio.TimeoutError:
+                        print(f"[TIMEOUT] No ACK for seq={seq}, retransmitting...")
+                else:
+                    print(f"[FAIL] Max retries reached for seq={seq}")
+                    return None
+
+                chunk = next_chunk
+
+        print(f"[DONE] Upload complete.")
+        self.seq = seq
+        return seq
+
+    # =======================================
+    #  Teardown
+    # =======================================
+
+    async def teardown(self):
+        """Send FIN and wait for FIN-ACK to close session."""
+        for attempt in range(1, MAX_RETRIES + 1):
+            self.send(build_fin(self.seq))
+            print(f"[FIN] Sent (attempt {attempt})")
+
+            try:
+                fin_ack_pkt = await self.expect(lambda p: p["type"] == FIN_ACK)
+
+                if fin_ack_pkt["type"] == FIN_ACK:
+                    print(f"[FIN-ACK] Received, session closed.")
+                    return True
+
+            except asyncio.TimeoutError:
+                print(f"[TIMEOUT] Waiting for FIN-ACK (attempt {attempt})")
+
+        print("[FAIL] Teardown failed after max retries.")
+        return False
+
+    async def close(self):
+        """Tear down the session (if established) and close the endpoint."""
+        if self.transport is None:
+            return
+        if self.seq is not None:
+            await self.teardown()
+        self.transport.close()
+        await self.protocol.closed
+        self.transport = None
+
+
+# =======================================
+#  Concurrent helpers
+# =======================================
+
+async def get(filename, host=SERVER_HOST, port=SERVER_PORT, timeout=TIMEOUT):
+    """Download one file over its own session. Returns True on success."""
+    async with Session(host, port, timeout) as session:
+        if session.seq is None:
+            return False
+        return await session.download(filename) is not None
+
+
+async def put(filename, host=SERVER_HOST, port=SERVER_PORT, timeout=TIMEOUT):
+    """Upload one file over its own session. Returns True on success."""
+    async with Session(host, port, timeout) as session:
+        if session.seq is None:
+            return False
+        return await session.upload(filename) is not None
+
+
+async def run_transfers(operations, host=SERVER_HOST, port=SERVER_PORT, timeout=TIMEOUT):
+    """
+    Run many transfers at once on the current event loop.
+    operations: iterable of (GET|PUT, filename) pairs.
+    timeout: seconds each session waits before retransmitting.
+    Returns a list of booleans in the same order.
+    """
+    coros = []
+    for operation, filename in operations:
+        if operation == GET:
+            coros.append(get(filename, host, port, timeout))
+        elif operation == PUT:
+            coros.append(put(filename, host, port, timeout))
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+    return await asyncio.gather(*coros)
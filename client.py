@@ -1,6 +1,7 @@
 import socket
 import os
 from protocol import *
+from diskio import WriteBehind, DURABILITY_EOF
 
 # =======================================
 #  Config
@@ -8,6 +9,7 @@ from protocol import *
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 8080
 CLIENT_DIR  = "client/"   # folder of client files to upload/download
+DURABILITY  = DURABILITY_EOF   # when downloaded files are fsynced (none / eof / periodic)
 
 
 # =======================================
@@ -91,54 +93,63 @@ def download(sock, filename, seq):
     sock.sendto(build_ack(seq), (SERVER_HOST, SERVER_PORT))
     print(f"[ACK] Sent ready, starting download...")
 
-    # Receive DATA packets
+    # Receive DATA packets, disk writes happen on the write-behind thread
     save_path = os.path.join(CLIENT_DIR, filename)
-    received_chunks = {}
+    writer = WriteBehind(save_path, DURABILITY)
     expected_seq = seq + 1 # always expect a tick
 
-    while True:
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                sock.settimeout(TIMEOUT)
-                data_raw, _ = sock.recvfrom(HEADER_SIZE + CHUNK_SIZE)
-                data_pkt = parse_packet(data_raw)
+    try:
+        while True:
+            for attempt in range(1, MAX_RETRIES + 1):
+                try:
+                    sock.settimeout(TIMEOUT)
+                    data_raw, _ = sock.recvfrom(HEADER_SIZE + CHUNK_SIZE)
+                    data_pkt = parse_packet(data_raw)
 
-                if data_pkt["type"] == ERROR:
-                    print(f"[ERROR] Received error_type={data_pkt['error_type']} during transfer")
-                    return None
+                    if data_pkt["type"] == ERROR:
+                        print(f"[ERROR] Received error_type={data_pkt['error_type']} during transfer")
+                        return None
 
-                if data_pkt["type"] == DATA:
-                    seq = data_pkt["seq"]
-                    eof = data_pkt["eof"]
-                    payload = data_pkt["payload"]
+                    if data_pkt["type"] == DATA:
+                        seq = data_pkt["seq"]
+                        eof = data_pkt["eof"]
+                        payload = data_pkt["payload"]
 
-                    if seq != expected_seq:
-                        print(f"[UNEXPECTED] Expected seq={expected_seq}, got seq={seq}")
-                        sock.sendto(build_error(ERR_UNEXPECTED), (SERVER_HOST, SERVER_PORT))
-                        continue
+                        if seq != expected_seq:
+                            print(f"[UNEXPECTED] Expected seq={expected_seq}, got seq={seq}")
+                            sock.sendto(build_error(ERR_UNEXPECTED), (SERVER_HOST, SERVER_PORT))
+                            continue
 
-                    print(f"[DATA] Received seq={seq} EOF={eof} size={len(payload)} bytes")
-                    received_chunks[seq] = payload
+                        print(f"[DATA] Received seq={seq} EOF={eof} size={len(payload)} bytes")
+                        try:
+                            writer.put(payload)   # blocks (holding the ACK) only if the disk falls behind
+                        except OSError as e:
+                            print(f"[ERROR] Could not write {save_path}: {e}")
+                            return None
 
-                    sock.sendto(build_ack(seq), (SERVER_HOST, SERVER_PORT))
-                    print(f"[ACK] Sent seq={seq}")
+                        sock.sendto(build_ack(seq), (SERVER_HOST, SERVER_PORT))
+                        print(f"[ACK] Sent seq={seq}")
 
-                    expected_seq += 1
-                    if eof == EOF_LAST:
-                        print(f"[EOF] Last packet received, saving file...")
-                        with open(save_path, "wb") as f:
-                            for k in sorted(received_chunks.keys()):
-                                f.write(received_chunks[k])
-                        print(f"[DONE] File saved to {save_path}")
-                        return expected_seq  # return updated seq
+                        expected_seq += 1
+                        if eof == EOF_LAST:
+                            print(f"[EOF] Last packet received, saving file...")
+                            try:
+                                writer.finish()
+                            except OSError as e:
+                                print(f"[ERROR] Could not write {save_path}: {e}")
+                                return None
+                            print(f"[DONE] File saved to {save_path}")
+                            return expected_seq  # return updated seq
 
-                    break
+                        break
 
-            except socket.timeout:
-                print(f"[TIMEOUT] Waiting for DATA seq={expected_seq} (attempt {attempt})")
-        else:
-            print(f"[FAIL] Max retries reached waiting for seq={expected_seq}")
-            return None
+                except socket.timeout:
+                    print(f"[TIMEOUT] Waiting for DATA seq={expected_seq} (attempt {attempt})")
+            else:
+                print(f"[FAIL] Max retries reached waiting for seq={expected_seq}")
+                return None
+    finally:
+        writer.abort()   # no-op after finish(); cleans up on any other exit
 
 
 # =======================================
@@ -201,8 +212,9 @@ def upload(sock, filename, seq):
             if next_chunk:
                 f.seek(-len(next_chunk), 1)
 
+            header = build_data_header(seq, eof)
             for attempt in range(1, MAX_RETRIES + 1):
-                sock.sendto(build_data(seq, chunk, eof=eof), (SERVER_HOST, SERVER_PORT))
+                send_data(sock, (SERVER_HOST, SERVER_PORT), header, chunk)
                 print(f"[DATA] Sent seq={seq} EOF={eof} size={len(chunk)} bytes (attempt {attempt})")
 
                 try:
@@ -0,0 +1,120 @@
+import os
+import queue
+import threading
+import time
+
+# =========================================
+#  Durability Policies
+# =========================================
+DURABILITY_NONE     = "none"       # Leave flushing to the OS
+DURABILITY_EOF      = "eof"        # fsync once when the file is complete
+DURABILITY_PERIODIC = "periodic"   # fsync every SYNC_INTERVAL seconds and at EOF
+DURABILITY_POLICIES = (DURABILITY_NONE, DURABILITY_EOF, DURABILITY_PERIODIC)
+
+# =========================================
+#  Config
+# =========================================
+WRITE_QUEUE_SIZE = 64    # Max chunks waiting for the disk before the receiver blocks
+SYNC_INTERVAL    = 1     # Seconds between fsyncs for DURABILITY_PERIODIC
+
+_FINISH = object()
+_ABORT  = object()
+
+
+class WriteBehind:
+    """
+    Write a received file on a dedicated I/O thread.
+    The receiver hands over chunks with put() and can ACK right away.
+    The queue is bounded: when the disk falls behind, put() blocks, and the
+    next ACK is held back. With stop-and-wait, this is the receive window
+    closing. Data goes to a unique <path>.<pid>-<id>.part file and is renamed into
+    place by finish(), so a failed transfer never leaves a partial file under the
+    real name and concurrent transfers of the same file do not collide.
+    """
+
+    def __init__(self, path, durability=DURABILITY_EOF, queue_size=WRITE_QUEUE_SIZE):
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability policy: {durability}")
+        self.path = path
+        self.durability = durability
+        self.chunks = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.closed = False    # finish() or abort() has run
+        self.part_path = f"{path}.{os.getpid()}-{id(self)}.part"
+        self.file = open(self.part_path, "xb")
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        last_sync = time.monotonic()
+        while True:
+            chunk = self.chunks.get()
+            if chunk is _FINISH or chunk is _ABORT:
+                break
+            if self.error is not None:
+                continue   # keep draining so put() never blocks forever
+            try:
+                self.file.write(chunk)
+                if self.durability == DURABILITY_PERIODIC and time.monotonic() - last_sync >= SYNC_INTERVAL:
+                    self.file.flush()
+                    os.fsync(self.file.fileno())
+                    last_sync = time.monotonic()
+            except OSError as e:
+                self.error = e
+
+        try:
+            if chunk is _FINISH and self.error is None:
+                self.file.flush()
+                if self.durability != DURABILITY_NONE:
+                    os.fsync(self.file.fileno())
+        except OSError as e:
+            self.error = e
+        finally:
+            self.file.close()
+
+    def put(self, payload):
+        """Queue a chunk for writing. Blocks while the queue is full. Raises the I/O thread's error."""
+        if self.error is not None:
+            raise self.error
+        self.chunks.put(payload)
+
+    def try_put(self, payload):
+        """
+        Queue a chunk without blocking, for callers that must not tie up a
+        thread (e.g. an event loop). Returns False if the queue is full.
+        Raises the I/O thread's error.
+        """
+        if self.error is not None:
+            raise self.error
+        try:
+            self.chunks.put_nowait(payload)
+        except queue.Full:
+            return False
+        return True
+
+    def finish(self):
+        """Flush everything, apply the durability policy and move the file into place."""
+        self.closed = True
+        self.chunks.put(_FINISH)
+        self.thread.join()
+        try:
+            if self.error is not None:
+                raise self.error
+            os.replace(self.part_path, self.path)
+        except OSError:
+            os.remove(self.part_path)
+            raise
+
+    def abort(self):
+        """
+        Stop writing and discard the partial file.
+        Does nothing once finish() or abort() has run, so receivers can
+        call it unconditionally on the way out.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.chunks.put(_ABORT)
+        self.thread.join()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
@@ -1,4 +1,5 @@
 import random
+import socket
 
 # =========================================
 #  Message Type Constants
@@ -39,6 +40,8 @@ HEADER_SIZE = 64        # Max header size in bytes
 TIMEOUT     = 5         # Seconds before retransmit
 MAX_RETRIES = 10        # Max retransmit attempts
 
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+
 
 # =========================================
 #  Packet Builders
@@ -92,14 +95,33 @@ def build_error(error_type):
     """Server -> Client: Send error message."""
     return f"ERROR {error_type}\n".encode()
 
+DATA_HEADER_TEMPLATE = b"DATA SEQ=%d EOF=%d\n"
+
+
+def build_data_header(seq, eof=EOF_MORE):
+    """Build only the header of a DATA packet, for scatter-gather sends."""
+    return DATA_HEADER_TEMPLATE % (seq, eof)
+
+
 def build_data(seq, payload_bytes, eof=EOF_MORE):
     """
     Build a DATA packet.
     Header is text, payload is raw bytes (binary-safe).
     Format: DATA SEQ=<seq> EOF=<eof>\n<payload bytes>
     """
-    header = f"DATA SEQ={seq} EOF={eof}\n".encode()
-    return header + payload_bytes
+    return build_data_header(seq, eof) + payload_bytes
+
+
+def send_data(sock, addr, header, payload_bytes):
+    """
+    Send a DATA packet as separate header and payload buffers
+    so the payload is never copied into a new bytes object.
+    Falls back to a single sendto where sendmsg is unavailable (Windows).
+    """
+    if HAS_SENDMSG:
+        sock.sendmsg([header, payload_bytes], (), 0, addr)
+    else:
+        sock.sendto(header + payload_bytes, addr)
 
 # =========================================
 #  Packet Parser
@@ -109,8 +131,16 @@ def parse_packet(raw_bytes):
     """
     Parse a raw packet back into its components.
     Returns a dict with 'type' and relevant fields.
-    Raises ValueError if packet is malformed.
+    Raises ValueError if packet is malformed (and only ValueError,
+    so receivers can drop junk datagrams with a single except).
     """
+    try:
+        return _parse_packet(raw_bytes)
+    except (IndexError, KeyError) as e:
+        raise ValueError(f"Malformed packet: {bytes(raw_bytes[:HEADER_SIZE])!r}") from e
+
+
+def _parse_packet(raw_bytes):
     # Split header and payload on first newline
     # (DATA packets have binary payload after the newline)
     newline_idx = raw_bytes.index(b"\n")
@@ -149,7 +179,9 @@ def parse_packet(raw_bytes):
 
     # FIN
     elif msg_type == FIN:
-        return {"type": FIN}
+        # "FIN SEQ=x"
+        seq = int(parts[1].split("=")[1])
+        return {"type": FIN, "seq": seq}
 
     # FIN-ACK
     elif msg_type == FIN_ACK:
@@ -165,6 +197,8 @@ def parse_packet(raw_bytes):
         elif operation == PUT:
             filesize = int(parts[3])
             return {"type": REQUEST, "operation": PUT, "filename": filename, "filesize": filesize}
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
 
     # ERROR
     elif msg_type == ERROR:
@@ -0,0 +1,272 @@
+import json
+import multiprocessing
+import time
+from protocol import CHUNK_SIZE, HEADER_SIZE
+
+# =========================================
+#  Config
+# =========================================
+MIN_BURST = HEADER_SIZE + CHUNK_SIZE   # Smallest bucket, so one full packet always fits
+DEFAULT_WEIGHT = 1                     # Weight of a client not listed in the limits file
+LIMIT_KEYS = ("rate", "session_rate", "weights")
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_rate(rate):
+    """Rates are bytes/sec, None means unlimited. Raises ValueError for anything else or rates <= 0."""
+    if rate is None:
+        return None
+    if not is_number(rate):
+        raise ValueError(f"Rate must be a number or null, got {rate!r}")
+    if rate <= 0:
+        raise ValueError(f"Rate must be positive, got {rate}")
+    return rate
+
+
+def check_weights(weights):
+    """Weights map a client host to a positive number. Raises ValueError otherwise."""
+    if not isinstance(weights, dict):
+        raise ValueError(f"Weights must be an object of host: weight, got {weights!r}")
+    for host, weight in weights.items():
+        if not is_number(weight) or weight <= 0:
+            raise ValueError(f"Weight for {host} must be a positive number, got {weight!r}")
+    return weights
+
+
+def load_limits(path):
+    """
+    Read limits from a JSON file, e.g.
+    {"rate": 40000, "session_rate": null, "weights": {"127.0.0.1": 2}}.
+    Only the keys present are returned; null means unlimited.
+    Raises ValueError (or OSError) if the file is unusable.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"Limits must be a JSON object, got {type(config).__name__}")
+    unknown = set(config) - set(LIMIT_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown limits: {', '.join(sorted(unknown))}")
+    limits = {}
+    for key in ("rate", "session_rate"):
+        if key in config:
+            limits[key] = check_rate(config[key])
+    if "weights" in config:
+        limits["weights"] = check_weights(config["weights"])
+    return limits
+
+
+# =========================================
+#  Token Bucket
+# =========================================
+class TokenBucket:
+    """
+    Byte-rate limiter. rate is in bytes/sec, None means unlimited.
+    Tokens may go negative: the caller is told how long to wait
+    instead of being refused, so a packet is never split.
+    """
+
+    def __init__(self, rate=None):
+        self.rate = check_rate(rate)
+        self.tokens = self.capacity()
+        self.last = time.monotonic()
+
+    def capacity(self):
+        if self.rate is None:
+            return 0
+        return max(self.rate, MIN_BURST)
+
+    def set_rate(self, rate):
+        check_rate(rate)
+        self.refill()
+        was_unlimited = self.rate is None
+        self.rate = rate
+        if was_unlimited:
+            self.tokens = self.capacity()
+        else:
+            self.tokens = min(self.tokens, self.capacity())
+
+    def refill(self):
+        now = time.monotonic()
+        if self.rate is not None:
+            self.tokens = min(self.capacity(), self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def reserve(self, nbytes):
+        """Take nbytes of tokens. Returns seconds to wait before sending."""
+        if self.rate is None:
+            return 0
+        self.refill()
+        self.tokens -= nbytes
+        if self.tokens >= 0:
+            return 0
+        return -self.tokens / self.rate
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket whose state lives in shared memory, so every worker
+    process draws from the same budget.
+    """
+
+    def __init__(self, rate=None):
+        self.state = multiprocessing.Array("d", 3)   # rate (0 = unlimited), tokens, last
+        super().__init__(rate)
+
+    @property
+    def rate(self):
+        return self.state[0] or None
+
+    @rate.setter
+    def rate(self, value):
+        self.state[0] = value or 0
+
+    @property
+    def tokens(self):
+        return self.state[1]
+
+    @tokens.setter
+    def tokens(self, value):
+        self.state[1] = value
+
+    @property
+    def last(self):
+        return self.state[2]
+
+    @last.setter
+    def last(self, value):
+        self.state[2] = value
+
+    def set_rate(self, rate):
+        with self.state.get_lock():
+            super().set_rate(rate)
+
+    def reserve(self, nbytes):
+        with self.state.get_lock():
+            return super().reserve(nbytes)
+
+
+# =========================================
+#  Scheduler
+# =========================================
+class BandwidthScheduler:
+    """
+    Global and per-session byte-rate limits with weighted fair sharing for GET transfers.
+    Every send takes tokens from the session's bucket and from one global bucket.
+    Each session's bucket runs at min(session_rate, global_rate * weight / active_weight),
+    where active_weight is the sum of the weights of all sessions in progress.
+    The global bucket, the session rate and the active weights are in shared
+    memory (one slot per worker), so a scheduler passed to worker processes
+    shares one budget between every session on every worker, and
+    set_global_rate / set_session_rate take effect everywhere immediately.
+    """
+
+    def __init__(self, global_rate=None, session_rate=None, slots=1):
+        self.global_bucket = SharedTokenBucket(global_rate)
+        self.shared_session_rate = multiprocessing.Value("d", check_rate(session_rate) or 0)
+        self.active_weights = multiprocessing.Array("d", slots)   # per-worker sum of session weights
+        self.slot = 0          # this process's index into active_weights
+        self.weights = {}      # client host -> weight, per process
+        self.sessions = {}     # session_id -> {"bucket", "weight", "bytes", "start"}
+        self.total_bytes = 0
+        self.active_time = 0   # seconds with at least one session, excluding the current stretch
+        self.active_since = None
+
+    # ---- configuration ----
+
+    @property
+    def global_rate(self):
+        return self.global_bucket.rate
+
+    @property
+    def session_rate(self):
+        return self.shared_session_rate.value or None
+
+    def set_global_rate(self, rate):
+        self.global_bucket.set_rate(rate)
+
+    def set_session_rate(self, rate):
+        self.shared_session_rate.value = check_rate(rate) or 0
+
+    def set_weights(self, weights):
+        """Weights by client host for sessions started from now on."""
+        self.weights = dict(check_weights(weights))
+
+    def weight_for(self, host):
+        return self.weights.get(host, DEFAULT_WEIGHT)
+
+    def clear_slot(self, slot):
+        """Forget the active weight of a worker that died mid-transfer."""
+        self.active_weights[slot] = 0
+
+    def session_limit(self, session):
+        """Current rate for a session: its weighted share of the global rate, capped by session_rate."""
+        rate = self.session_rate
+        global_rate = self.global_rate
+        if global_rate is not None:
+            with self.active_weights.get_lock():
+                active_weight = sum(self.active_weights)
+            share = global_rate * session["weight"] / max(active_weight, session["weight"])
+            rate = share if rate is None else min(rate, share)
+        return rate
+
+    # ---- sessions ----
+
+    def add_session(self, session_id, weight=DEFAULT_WEIGHT):
+        if not is_number(weight) or weight <= 0:
+            raise ValueError(f"Weight must be a positive number, got {weight!r}")
+        if not self.sessions:
+            self.active_since = time.monotonic()
+        with self.active_weights.get_lock():
+            self.active_weights[self.slot] += weight
+        session = {"bucket": None, "weight": weight, "bytes": 0, "start": time.monotonic()}
+        session["bucket"] = TokenBucket(self.session_limit(session))
+        self.sessions[session_id] = session
+
+    def remove_session(self, session_id):
+        """Stop tracking a session. Returns its achieved rate in bytes/sec."""
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return 0
+        with self.active_weights.get_lock():
+            self.active_weights[self.slot] = max(self.active_weights[self.slot] - session["weight"], 0)
+        if not self.sessions:
+            self.active_time += time.monotonic() - self.active_since
+            self.active_since = None
+        return session_rate_of(session)
+
+    def acquire(self, session_id, nbytes):
+        """Block until session_id may send nbytes."""
+        session = self.sessions[session_id]
+        bucket = session["bucket"]
+        rate = self.session_limit(session)
+        if bucket.rate != rate:
+            bucket.set_rate(rate)
+        wait = max(bucket.reserve(nbytes), self.global_bucket.reserve(nbytes))
+        session["bytes"] += nbytes
+        self.total_bytes += nbytes
+        if wait > 0:
+            time.sleep(wait)
+
+    # ---- reporting ----
+
+    def rates(self):
+        """
+        Achieved rates in bytes/sec for this process: overall (over the time
+        any session was active, not idle time) and for each active session.
+        """
+        active = self.active_time
+        if self.active_since is not None:
+            active += time.monotonic() - self.active_since
+        return {
+            "global": self.total_bytes / active if active > 0 else 0,
+            "sessions": {sid: session_rate_of(s) for sid, s in self.sessions.items()},
+        }
+
+
+def session_rate_of(session):
+    elapsed = time.monotonic() - session["start"]
+    return session["bytes"] / elapsed if elapsed > 0 else 0
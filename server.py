@@ -3,7 +3,14 @@ import argparse
 import time
 import random
 import os
+import sys
+import signal
+import queue
+import threading
+import multiprocessing
 from protocol import *
+from ratelimit import BandwidthScheduler, load_limits
+from diskio import WriteBehind, DURABILITY_EOF, DURABILITY_POLICIES
 
 # DEBUGGING
 # we need to handle if server timeouts, client has to close connection on their end
@@ -16,26 +23,57 @@ SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 8080
 SERVER_DIR  = "server/"   # folder of client files to upload/download
 
-def start_server():
+STATS_INTERVAL = 5         # Seconds between worker stats reports
+RESTART_BACKOFF     = 0.5  # Seconds before restarting a crashed worker, doubled per fast crash
+RESTART_BACKOFF_MAX = 30   # Longest wait between restarts
+RESTART_RESET       = 60   # A worker that ran this long before crashing starts the backoff over
+MAX_STARTUP_FAILURES = 5   # Give up on a worker that fails this many times before serving
+EXIT_BIND_FAILED    = 3    # Worker exit code when the port cannot be bound
+STAT_KEYS = ("sessions", "gets", "puts", "bytes_sent", "bytes_received", "errors")
+
+
+def new_stats():
+    return {key: 0 for key in STAT_KEYS}
+
+
+def make_socket(reuse_port=False):
+    """Create and bind the server socket. reuse_port lets several workers share the port."""
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
     sock.bind((SERVER_HOST, SERVER_PORT))
+    return sock
+
+
+def start_server(sock=None, stats=None, scheduler=None, durability=DURABILITY_EOF):
+    if sock is None:
+        sock = make_socket()
+    if stats is None:
+        stats = new_stats()
+    if scheduler is None:
+        scheduler = BandwidthScheduler()
     print(f"Server listening on {SERVER_HOST}:{SERVER_PORT}...")
     conn = 0
 
     # listen for SYN
     while True:
         raw_bytes, client_addr = sock.recvfrom(HEADER_SIZE + CHUNK_SIZE)
-        init = parse_packet(raw_bytes)
+        try:
+            init = parse_packet(raw_bytes)
+        except ValueError as e:
+            print(f"[UNEXPECTED] Dropped packet from {client_addr}: {e}")
+            continue
         if init["type"] == SYN and conn == 0:
             conn = establish_connection(sock, client_addr, raw_bytes)
 
             if conn == 0:
                 print(f"Could not establish connection with {client_addr}.")
             if conn == 1:
+                stats["sessions"] += 1
                 while True:
                     try:
                         # ACCEPT GET REQUEST FROM CLIENT
-                        req_bytes, client_addr = sock.recvfrom(HEADER_SIZE + CHUNK_SIZE)
+                        req_bytes = recv_from(sock, client_addr)
                         req = parse_packet(req_bytes)
                         sock.settimeout(60) # USES SEPERATE TIMEOUT TIME FOR USER CHOOSING
 
@@ -50,6 +88,7 @@ def start_server():
                             if not os.path.exists(filepath):
                                 print(f"[ERROR] File '{filename}' not found.")
                                 sock.sendto(build_error(ERR_NOT_FOUND), client_addr)
+                                stats["errors"] += 1
                                 continue
 
                             filesize = os.path.getsize(filepath)
@@ -60,7 +99,7 @@ def start_server():
                             print(f"[ACK] Sent filesize={filesize}")
                             
                             # RECEIVE READY ACK FROM CLIENT
-                            ready_ack_raw, _ = sock.recvfrom(HEADER_SIZE + CHUNK_SIZE)
+                            ready_ack_raw = recv_from(sock, client_addr)
                             ready_ack = parse_packet(ready_ack_raw)
                             if ready_ack["type"] != ACK:
                                 sock.sendto(build_error(ERR_UNEXPECTED), client_addr)
@@ -71,47 +110,60 @@ def start_server():
                             seq = ready_ack["ack"] # current seq of client so need to minus 1
                                                    # # dont need to add since the ACK for file size has no SEQ
                             done = False 
-                            with open(filepath, "rb") as f:
-                                while not done:
-                                    chunk = f.read(CHUNK_SIZE)
-                                    if not chunk:
-                                        break
-
-                                    next_chunk = f.read(CHUNK_SIZE)
-                                    eof = EOF_LAST if not next_chunk else EOF_MORE
-                                    if next_chunk:
-                                        f.seek(-len(next_chunk), 1)
-
-                                    for attempt in range(1, MAX_RETRIES + 1):
-                                        # SEND DATA SEQ EOF
-                                        sock.sendto(build_data(seq, chunk, eof=eof), client_addr)
-                                        print(f"[DATA] Sent seq={seq} EOF={eof} size={len(chunk)} bytes (attempt {attempt})")
-
-                                        try:
-                                            sock.settimeout(TIMEOUT)
-                                            ack_raw, _ = sock.recvfrom(HEADER_SIZE + CHUNK_SIZE)
-                                            ack_pkt = parse_packet(ack_raw)
-
-                                            if ack_pkt["type"] == ACK and ack_pkt["ack"] == seq + 1:
-                                                print(f"[ACK] Received seq={seq}")
-                                                seq += 1
-                                                if eof == EOF_LAST:                       
-                                                    print(f"[EOF] Last packet ACKed.")   
-                                                    done = True                          
-                                                break
-
-                                            if ack_pkt["type"] == ERROR:
-                                                print(f"[ERROR] Client error type={ack_pkt['error_type']}")
-                                                done = True
-                                                break
-
-                                        except socket.timeout:
-                                            print(f"[TIMEOUT] No ACK for seq={seq}, retransmitting... (attempt {attempt})")
-                                    else:
-                                        print(f"[FAIL] Max retries reached for seq={seq}")
-                                        done = True
+                            weight = scheduler.weight_for(client_addr[0])
+                            scheduler.add_session(client_addr, weight)
+                            try:
+                                with open(filepath, "rb") as f:
+                                    while not done:
+                                        chunk = f.read(CHUNK_SIZE)
+                                        if not chunk:
+                                            break
 
+                                        next_chunk = f.read(CHUNK_SIZE)
+                                        eof = EOF_LAST if not next_chunk else EOF_MORE
+                                        if next_chunk:
+                                            f.seek(-len(next_chunk), 1)
+
+                                        header = build_data_header(seq, eof)
+                                        for attempt in range(1, MAX_RETRIES + 1):
+                                            # SEND DATA SEQ EOF (header and payload as separate buffers)
+                                            scheduler.acquire(client_addr, len(header) + len(chunk))
+                                            send_data(sock, client_addr, header, chunk)
+                                            print(f"[DATA] Sent seq={seq} EOF={eof} size={len(chunk)} bytes (attempt {attempt})")
+
+                                            try:
+                                                sock.settimeout(TIMEOUT)
+                                                ack_raw = recv_from(sock, client_addr)
+                                                ack_pkt = parse_packet(ack_raw)
+
+                                                if ack_pkt["type"] == ACK and ack_pkt.get("ack") == seq + 1:
+                                                    print(f"[ACK] Received seq={seq}")
+                                                    stats["bytes_sent"] += len(chunk)
+                                                    seq += 1
+                                                    if eof == EOF_LAST:                       
+                                                        print(f"[EOF] Last packet ACKed.")   
+                                                        done = True                          
+                                                    break
+
+                                                if ack_pkt["type"] == ERROR:
+                                                    print(f"[ERROR] Client error type={ack_pkt['error_type']}")
+                                                    stats["errors"] += 1
+                                                    done = True
+                                                    break
+
+                                            except socket.timeout:
+                                                print(f"[TIMEOUT] No ACK for seq={seq}, retransmitting... (attempt {attempt})")
+                                            except ValueError as e:
+                                                print(f"[UNEXPECTED] Dropped packet: {e}")
+                                        else:
+                                            print(f"[FAIL] Max retries reached for seq={seq}")
+                                            done = True
+                            finally:
+                                rate = scheduler.remove_session(client_addr)
+                            stats["gets"] += 1
                             print(f"[DONE] File transfer complete.")
+                            print(f"[RATE] Session {rate:.0f} B/s (weight {weight}), "
+                                  f"this process (pid {os.getpid()}) {scheduler.rates()['global']:.0f} B/s while active")
 
                         # =======================================
                         # server side handling of PUT request
@@ -128,7 +180,7 @@ def start_server():
                             print(f"[ACK] Sent filesize={filesize}, ready to receive")
 
                             # Wait for ready ACK — triple handshake
-                            ready_ack_raw, _ = sock.recvfrom(4096 + CHUNK_SIZE)
+                            ready_ack_raw = recv_from(sock, client_addr, 4096 + CHUNK_SIZE)
                             ready_ack = parse_packet(ready_ack_raw)
                             if ready_ack["type"] != ACK:
                                 sock.sendto(build_error(ERR_UNEXPECTED), client_addr)
@@ -138,48 +190,70 @@ def start_server():
                             # Receive file chunk by chunk
                             seq = ready_ack["ack"] - 1 # current seq of client so need to minus 1
                             save_path = os.path.join(SERVER_DIR, filename)
-                            received_chunks = {}
+                            writer = WriteBehind(save_path, durability)   # disk writes off the ACK path
                             done = False
 
-                            while not done:
-                                for attempt in range(1, MAX_RETRIES + 1):
-                                    try:
-                                        sock.settimeout(TIMEOUT)
-                                        data_raw, _ = sock.recvfrom(4096 + CHUNK_SIZE)
-                                        data_pkt = parse_packet(data_raw)
-
-                                        if data_pkt["type"] == ERROR:
-                                            print(f"[ERROR] Client error type={data_pkt['error_type']}")
-                                            done = True
-                                            break
+                            try:
+                                while not done:
+                                    for attempt in range(1, MAX_RETRIES + 1):
+                                        try:
+                                            sock.settimeout(TIMEOUT)
+                                            data_raw = recv_from(sock, client_addr, 4096 + CHUNK_SIZE)
+                                            data_pkt = parse_packet(data_raw)
 
-                                        if data_pkt["type"] == DATA:
-                                            if data_pkt["seq"] != seq:
-                                                print(f"[UNEXPECTED] Expected seq={seq}, got seq={data_pkt['seq']}")
-                                                sock.sendto(build_error(ERR_UNEXPECTED), client_addr)
-                                                continue
-
-                                            print(f"[DATA] Received seq={data_pkt['seq']} EOF={data_pkt['eof']} size={len(data_pkt['payload'])} bytes")
-                                            received_chunks[data_pkt["seq"]] = data_pkt["payload"]
-
-                                            sock.sendto(build_ack(seq), client_addr)
-                                            print(f"[ACK] Sent seq={seq}")
-                                            seq += 1
-
-                                            if data_pkt["eof"] == EOF_LAST:
-                                                print(f"[EOF] Last packet received, saving file...")
-                                                with open(save_path, "wb") as f:
-                                                    for k in sorted(received_chunks.keys()):
-                                                        f.write(received_chunks[k])
-                                                print(f"[DONE] File saved to {save_path}")
+                                            if data_pkt["type"] == ERROR:
+                                                print(f"[ERROR] Client error type={data_pkt['error_type']}")
+                                                stats["errors"] += 1
                                                 done = True
-                                            break
+                                                break
+
+                                            if data_pkt["type"] == DATA:
+                                                if data_pkt["seq"] != seq:
+                                                    print(f"[UNEXPECTED] Expected seq={seq}, got seq={data_pkt['seq']}")
+                                                    sock.sendto(build_error(ERR_UNEXPECTED), client_addr)
+                                                    continue
+
+                                                print(f"[DATA] Received seq={data_pkt['seq']} EOF={data_pkt['eof']} size={len(data_pkt['payload'])} bytes")
+                                                try:
+                                                    writer.put(data_pkt["payload"])   # blocks (holding the ACK) only if the disk falls behind
+                                                except OSError as e:
+                                                    print(f"[ERROR] Could not write {save_path}: {e}")
+                                                    sock.sendto(build_error(ERR_UNEXPECTED), client_addr)
+                                                    stats["errors"] += 1
+                                                    done = True
+                                                    break
+                                                stats["bytes_received"] += len(data_pkt["payload"])
+
+                                                # the last ACK waits until the file is durably in place,
+                                                # so the client never reports success for a lost upload
+                                                if data_pkt["eof"] == EOF_LAST:
+                                                    print(f"[EOF] Last packet received, saving file...")
+                                                    try:
+                                                        writer.finish()
+                                                    except OSError as e:
+                                                        print(f"[ERROR] Could not write {save_path}: {e}")
+                                                        sock.sendto(build_error(ERR_UNEXPECTED), client_addr)
+                                                        stats["errors"] += 1
+                                                        done = True
+                                                        break
+                                                    print(f"[DONE] File saved to {save_path}")
+                                                    stats["puts"] += 1
+                                                    done = True
+
+                                                sock.sendto(build_ack(seq), client_addr)
+                                                print(f"[ACK] Sent seq={seq}")
+                                                seq += 1
+                                                break
 
-                                    except socket.timeout:
-                                        print(f"[TIMEOUT] Waiting for DATA seq={seq} (attempt {attempt})")
-                                else:
-                                    print(f"[FAIL] Max retries reached waiting for seq={seq}")
-                                    done = True
+                                        except socket.timeout:
+                                            print(f"[TIMEOUT] Waiting for DATA seq={seq} (attempt {attempt})")
+                                        except ValueError as e:
+                                            print(f"[UNEXPECTED] Dropped packet: {e}")
+                                    else:
+                                        print(f"[FAIL] Max retries reached waiting for seq={seq}")
+                                        done = True
+                            finally:
+                                writer.abort()   # no-op after finish(); cleans up on any other exit
 
                         # =======================================
                         # server side handling of FIN
@@ -196,10 +270,35 @@ def start_server():
                         print(f"Client {client_addr} went silent after handshake.")
                         conn = 0
                         break
+                    except (ValueError, IndexError, KeyError) as e:
+                        # malformed or out-of-place packet: skip it, keep the session
+                        print(f"[UNEXPECTED] Dropped packet from {client_addr}: {e!r}")
                     finally:
                         sock.settimeout(None)
 
 
+# receive the next datagram from the client in session with us.
+# other clients' packets are dropped (they keep retrying their SYN until we are free),
+# so they can't be mistaken for this session's ACKs and trigger retransmits.
+# honours the socket timeout as one deadline, not per dropped packet.
+def recv_from(sock, client_addr, bufsize=HEADER_SIZE + CHUNK_SIZE):
+    timeout = sock.gettimeout()
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    try:
+        while True:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout("timed out")
+                sock.settimeout(remaining)
+            raw_bytes, addr = sock.recvfrom(bufsize)
+            if addr == client_addr:
+                return raw_bytes
+            print(f"[BUSY] Dropped packet from {addr}, in session with {client_addr}")
+    finally:
+        sock.settimeout(timeout)
+
+
 # implementation of 3 way handshake from tcp
 # returns 1 if successful, returns 0 if not
 def establish_connection(sock, client_addr, raw_bytes):
@@ -213,10 +312,11 @@ def establish_connection(sock, client_addr, raw_bytes):
         print(f"[SYN-ACK] Sent SEQ={server_isn} (attempt {attempt})")
         try:
             sock.settimeout(TIMEOUT)
-            recv_bytes, addr = sock.recvfrom(HEADER_SIZE + CHUNK_SIZE)
+            recv_bytes = recv_from(sock, client_addr)
+            addr = client_addr
             packet = parse_packet(recv_bytes)
             if packet["type"] == ACK:
-                if expected_ack == packet["ack"]:
+                if expected_ack == packet.get("ack"):
                     print(f"Handshake complete with {addr}")
                     return 1
                 else:
@@ -226,12 +326,235 @@ def establish_connection(sock, client_addr, raw_bytes):
         except socket.timeout:
             print("Client no response, trying again.")
             continue
+        except ValueError as e:
+            print(f"[UNEXPECTED] Dropped packet: {e}")
+            continue
         finally:
             sock.settimeout(None)
     print("Handshake reached max retries.")
     return 0
 
 
+# =======================================
+#  Multi-process mode (SO_REUSEPORT)
+# =======================================
+
+def report_stats(worker_id, stats, stats_queue):
+    """Worker thread: push a stats snapshot to the supervisor every STATS_INTERVAL."""
+    pid = os.getpid()
+    while True:
+        time.sleep(STATS_INTERVAL)
+        stats_queue.put((worker_id, pid, dict(stats)))
+
+
+def run_worker(worker_id, stats_queue, scheduler, durability, limits_path):
+    """
+    Worker process entry point.
+    Each worker binds its own socket to the shared port; the kernel hashes
+    the client address so a session's packets keep landing on the same worker.
+    """
+    scheduler.slot = worker_id
+    if limits_path:
+        install_reload_handler(scheduler, limits_path)   # the supervisor forwards SIGHUP
+    elif hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    try:
+        sock = make_socket(reuse_port=True)
+    except OSError as e:
+        print(f"[WORKER {worker_id}] Could not bind {SERVER_HOST}:{SERVER_PORT}: {e}")
+        sys.exit(EXIT_BIND_FAILED)
+    stats_queue.put((worker_id, os.getpid(), None))   # bound and serving
+    stats = new_stats()
+    threading.Thread(target=report_stats, args=(worker_id, stats, stats_queue), daemon=True).start()
+    print(f"[WORKER {worker_id}] pid={os.getpid()}")
+    start_server(sock, stats, scheduler, durability)
+
+
+def spawn_worker(worker_id, stats_queue, scheduler, durability, limits_path):
+    proc = multiprocessing.Process(target=run_worker,
+                                   args=(worker_id, stats_queue, scheduler, durability, limits_path),
+                                   daemon=True)
+    proc.start()
+    return proc
+
+
+def plan_restart(exitcode, ready, uptime, failures):
+    """
+    Decide what to do with a dead worker.
+    ready: the worker had bound its socket and started serving.
+    uptime: seconds it ran. failures: consecutive quick crashes so far.
+    Returns (delay, failures): seconds to wait before restarting it,
+    or None to give up, and the updated failure count.
+    Only bind errors and repeated startup failures give up; a worker that
+    crashes while serving is always restarted, with backoff.
+    """
+    if exitcode == EXIT_BIND_FAILED:
+        return None, failures
+    failures = 0 if uptime >= RESTART_RESET else failures + 1
+    if not ready and failures >= MAX_STARTUP_FAILURES:
+        return None, failures
+    delay = min(RESTART_BACKOFF * 2 ** max(failures - 1, 0), RESTART_BACKOFF_MAX)
+    return delay, failures
+
+
+def start_workers(num_workers, scheduler=None, durability=DURABILITY_EOF, limits_path=None):
+    """
+    Supervisor: start num_workers server processes on the same port,
+    restart any that die (with backoff) and print aggregated stats.
+    All workers share the scheduler's global budget; it needs one slot per worker.
+    On SIGHUP the limits file is reloaded here and in every worker.
+    Linux only: elsewhere SO_REUSEPORT does not spread UDP across sockets.
+    """
+    if scheduler is None:
+        scheduler = BandwidthScheduler(slots=num_workers)
+    if not sys.platform.startswith("linux"):
+        print("[WARN] --workers needs Linux SO_REUSEPORT load balancing, running a single server.")
+        if limits_path:
+            install_reload_handler(scheduler, limits_path)
+        start_server(scheduler=scheduler, durability=durability)
+        return
+
+    stats_queue = multiprocessing.Queue()
+    workers = {i: spawn_worker(i, stats_queue, scheduler, durability, limits_path) for i in range(num_workers)}
+    started = {i: time.time() for i in workers}
+    ready = {i: False for i in workers}           # current process has bound and is serving
+    failures = {i: 0 for i in workers}            # consecutive crashes soon after start
+    restart_at = {}                               # worker_id -> time of next restart attempt
+    latest = {i: new_stats() for i in workers}    # last snapshot from each live worker
+    retired = new_stats()                         # totals from workers that have died
+    last_report = time.time()
+
+    if limits_path and hasattr(signal, "SIGHUP"):
+        def on_reload(signum, frame):
+            reload_limits(scheduler, limits_path)   # restarted workers inherit the new weights
+            for proc in workers.values():
+                os.kill(proc.pid, signal.SIGHUP)
+        signal.signal(signal.SIGHUP, on_reload)
+
+    try:
+        while workers or restart_at:
+            # drain every report before checking liveness, so a worker's
+            # "ready" message is seen even if it died right after sending it
+            timeout = 1
+            while True:
+                try:
+                    worker_id, pid, snapshot = stats_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                timeout = 0.01
+                proc = workers.get(worker_id)
+                if proc is not None and proc.pid == pid:   # ignore late reports from dead workers
+                    if snapshot is None:
+                        ready[worker_id] = True
+                    else:
+                        latest[worker_id] = snapshot
+
+            for worker_id, proc in list(workers.items()):
+                if proc.is_alive():
+                    continue
+                del workers[worker_id]
+                scheduler.clear_slot(worker_id)   # its sessions no longer take a share
+                for key in STAT_KEYS:
+                    retired[key] += latest[worker_id][key]
+                latest[worker_id] = new_stats()
+
+                delay, failures[worker_id] = plan_restart(proc.exitcode, ready[worker_id],
+                                                          time.time() - started[worker_id], failures[worker_id])
+                if delay is None:
+                    if proc.exitcode == EXIT_BIND_FAILED:
+                        print(f"[SUPERVISOR] Worker {worker_id} could not bind the port, not restarting.")
+                    else:
+                        print(f"[SUPERVISOR] Worker {worker_id} keeps failing at startup, giving up on it.")
+                    continue
+
+                print(f"[SUPERVISOR] Worker {worker_id} exited with code {proc.exitcode}, restarting in {delay:.1f}s...")
+                restart_at[worker_id] = time.time() + delay
+
+            for worker_id, when in list(restart_at.items()):
+                if time.time() >= when:
+                    del restart_at[worker_id]
+                    workers[worker_id] = spawn_worker(worker_id, stats_queue, scheduler, durability, limits_path)
+                    started[worker_id] = time.time()
+                    ready[worker_id] = False
+
+            if time.time() - last_report >= STATS_INTERVAL:
+                totals = {key: retired[key] + sum(s[key] for s in latest.values()) for key in STAT_KEYS}
+                print(f"[STATS] workers={len(workers)} " + " ".join(f"{k}={v}" for k, v in totals.items()))
+                last_report = time.time()
+
+        print("[SUPERVISOR] No workers left, exiting.")
+
+    except KeyboardInterrupt:
+        print("\nShutting down workers...")
+    finally:
+        for proc in workers.values():
+            proc.terminate()
+        for proc in workers.values():
+            proc.join()
+
+
+# =======================================
+#  Runtime rate limits
+# =======================================
+
+def positive_int(value):
+    """argparse type for rates: a whole number of bytes/sec above zero."""
+    rate = int(value)
+    if rate <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number of bytes/sec, got {value}")
+    return rate
+
+
+def reload_limits(scheduler, path):
+    """
+    Apply the limits in path to scheduler. Keys missing from the file keep
+    their current value (from the command line or an earlier load).
+    Bad files are reported and ignored.
+    """
+    try:
+        limits = load_limits(path)
+    except (OSError, ValueError) as e:
+        print(f"[LIMITS] Could not load {path}: {e}, keeping current limits.")
+        return
+    if "rate" in limits:
+        scheduler.set_global_rate(limits["rate"])
+    if "session_rate" in limits:
+        scheduler.set_session_rate(limits["session_rate"])
+    if "weights" in limits:
+        scheduler.set_weights(limits["weights"])
+    print(f"[LIMITS] rate={scheduler.global_rate} session_rate={scheduler.session_rate} weights={scheduler.weights}")
+
+
+def install_reload_handler(scheduler, path):
+    """Reload the limits file on SIGHUP (POSIX only)."""
+    if not hasattr(signal, "SIGHUP"):
+        print("[WARN] SIGHUP not available, --limits is only read at startup.")
+        return
+    signal.signal(signal.SIGHUP, lambda signum, frame: reload_limits(scheduler, path))
+
 
 if __name__ == "__main__":
-   start_server()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Reliable UDP file transfer server")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes sharing the port (Linux SO_REUSEPORT)")
+    parser.add_argument("--rate", type=positive_int, default=None,
+                        help="send limit in bytes/sec for the whole server, across all workers")
+    parser.add_argument("--session-rate", type=positive_int, default=None,
+                        help="send limit per GET session in bytes/sec")
+    parser.add_argument("--limits", default=None,
+                        help='JSON file {"rate": ..., "session_rate": ..., "weights": {host: weight}} '
+                             'read at startup and on SIGHUP; keys it leaves out keep the command-line value')
+    parser.add_argument("--durability", choices=DURABILITY_POLICIES, default=DURABILITY_EOF,
+                        help="when uploaded files are fsynced: none, eof or periodic")
+    args = parser.parse_args()
+
+    scheduler = BandwidthScheduler(args.rate, args.session_rate, slots=max(args.workers, 1))
+    if args.limits:
+        reload_limits(scheduler, args.limits)
+
+    if args.workers > 1:
+        start_workers(args.workers, scheduler, args.durability, args.limits)
+    else:
+        if args.limits:
+            install_reload_handler(scheduler, args.limits)
+        start_server(scheduler=scheduler, durability=args.durability)
\ No newline at end of file
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import socket
+import threading
+
+import pytest
+
+import async_client
+import server
+from protocol import GET, PUT
+
+
+@pytest.fixture
+def server_port(tmp_path, monkeypatch):
+    """Run start_server in a background thread on an ephemeral port."""
+    server_dir = tmp_path / "server"
+    client_dir = tmp_path / "client"
+    server_dir.mkdir()
+    client_dir.mkdir()
+    monkeypatch.setattr(server, "SERVER_DIR", str(server_dir) + os.sep)
+    monkeypatch.setattr(async_client, "CLIENT_DIR", str(client_dir) + os.sep)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    threading.Thread(target=server.start_server, args=(sock,), daemon=True).start()
+    return sock.getsockname()[1]
+
+
+def test_concurrent_transfers(tmp_path, server_port):
+    big = os.urandom(20 * 1024)
+    small = b"hello world\n"
+    upload = os.urandom(5000)
+    (tmp_path / "server" / "big.bin").write_bytes(big)
+    (tmp_path / "server" / "small.txt").write_bytes(small)
+    (tmp_path / "client" / "up.bin").write_bytes(upload)
+
+    operations = [(GET, "big.bin"), (PUT, "up.bin"), (GET, "small.txt")]
+    results = asyncio.run(async_client.run_transfers(operations, "127.0.0.1", server_port, timeout=0.5))
+
+    assert results == [True, True, True]
+    assert (tmp_path / "client" / "big.bin").read_bytes() == big
+    assert (tmp_path / "client" / "small.txt").read_bytes() == small
+    assert (tmp_path / "server" / "up.bin").read_bytes() == upload
+
+
+def test_missing_file(server_port):
+    results = asyncio.run(async_client.run_transfers([(GET, "nope.bin")], "127.0.0.1", server_port, timeout=0.5))
+    assert results == [False]
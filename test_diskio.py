@@ -0,0 +1,166 @@
+import threading
+import time
+
+import pytest
+
+from diskio import *
+
+
+class BrokenFile:
+    """Stands in for the .part file: every write fails like a full disk."""
+
+    def write(self, data):
+        raise OSError(28, "No space left on device")
+
+    def flush(self):
+        pass
+
+    def fileno(self):
+        raise OSError(9, "Bad file descriptor")
+
+    def close(self):
+        pass
+
+
+class StalledFile(BrokenFile):
+    """Stands in for the .part file: writes hang until released, like a slow disk."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def write(self, data):
+        self.release.wait()
+
+
+def wait_for_error(writer):
+    deadline = time.monotonic() + 2
+    while writer.error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("durability", DURABILITY_POLICIES)
+def test_finish_renames_part_file(tmp_path, durability):
+    path = tmp_path / "out.bin"
+    writer = WriteBehind(str(path), durability, queue_size=1)
+    for i in range(50):
+        writer.put(bytes([i]) * 512)
+    assert not path.exists()
+    writer.finish()
+
+    assert path.read_bytes() == b"".join(bytes([i]) * 512 for i in range(50))
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_abort_removes_part_file(tmp_path):
+    path = tmp_path / "out.bin"
+    writer = WriteBehind(str(path))
+    writer.put(b"partial")
+    writer.abort()
+
+    assert not path.exists()
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_same_path_does_not_collide(tmp_path):
+    path = tmp_path / "out.bin"
+    first = WriteBehind(str(path))
+    second = WriteBehind(str(path))
+    first.put(b"first")
+    second.put(b"second")
+    first.abort()
+    second.finish()
+
+    assert path.read_bytes() == b"second"
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_unknown_durability_policy(tmp_path):
+    with pytest.raises(ValueError):
+        WriteBehind(str(tmp_path / "out.bin"), "sometimes")
+
+
+def test_write_error_reaches_put(tmp_path):
+    writer = WriteBehind(str(tmp_path / "out.bin"))
+    writer.file.close()
+    writer.file = BrokenFile()
+    writer.put(b"data")
+    wait_for_error(writer)
+
+    with pytest.raises(OSError):
+        writer.put(b"more")
+    writer.abort()
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_write_error_reaches_finish(tmp_path):
+    path = tmp_path / "out.bin"
+    writer = WriteBehind(str(path))
+    writer.file.close()
+    writer.file = BrokenFile()
+    writer.put(b"data")
+
+    with pytest.raises(OSError):
+        writer.finish()
+    assert not path.exists()
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_fsync_error_reaches_finish(tmp_path):
+    path = tmp_path / "out.bin"
+    writer = WriteBehind(str(path), DURABILITY_EOF)
+    writer.file.close()
+    writer.file = BrokenFile()
+    writer.file.write = lambda data: None   # writes succeed, fsync fails
+
+    with pytest.raises(OSError):
+        writer.finish()
+    assert not path.exists()
+
+
+def test_rename_error_removes_part_file(tmp_path):
+    path = tmp_path / "out.bin"
+    path.mkdir()   # something is in the way of the final name
+    writer = WriteBehind(str(path))
+    writer.put(b"data")
+
+    with pytest.raises(OSError):
+        writer.finish()
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_try_put_reports_full_queue(tmp_path):
+    writer = WriteBehind(str(tmp_path / "out.bin"), DURABILITY_NONE, queue_size=1)
+    writer.file.close()
+    writer.file = StalledFile()
+    writer.put(b"taken by the I/O thread")
+    deadline = time.monotonic() + 2
+    while not writer.chunks.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert writer.try_put(b"queued")
+    assert not writer.try_put(b"no room")
+    writer.file.release.set()
+    writer.abort()
+
+
+def test_write_error_reaches_try_put(tmp_path):
+    writer = WriteBehind(str(tmp_path / "out.bin"))
+    writer.file.close()
+    writer.file = BrokenFile()
+    writer.put(b"data")
+    wait_for_error(writer)
+
+    with pytest.raises(OSError):
+        writer.try_put(b"more")
+    writer.abort()
+
+
+def test_abort_after_finish_keeps_file(tmp_path):
+    path = tmp_path / "out.bin"
+    writer = WriteBehind(str(path))
+    writer.put(b"data")
+    writer.finish()
+    writer.abort()
+    writer.abort()
+
+    assert path.read_bytes() == b"data"
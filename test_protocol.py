@@ -1,3 +1,5 @@
+import pytest
+
 from protocol import *
 
 raw = build_syn(12345)
@@ -8,10 +10,20 @@ raw = build_data(12345, b"hello world", eof=EOF_MORE)
 parsed = parse_packet(raw)
 print(parsed)
 
+raw = build_data_header(12345, eof=EOF_LAST) + b"hello world"
+parsed = parse_packet(raw)
+print(parsed)
+
 raw = build_error(ERR_NOT_FOUND)
 parsed = parse_packet(raw)
 print(parsed)
 
 raw = build_request_get("photo.png")
 parsed = parse_packet(raw)
-print(parsed)
\ No newline at end of file
+print(parsed)
+
+@pytest.mark.parametrize("raw", [b"x", b"\n", b"SYN\n", b"ACK\n", b"REQUEST FOO a\n",
+                                 b"DATA SEQ=1\n", b"\xff\n", b"SYN SEQ=abc\n"])
+def test_malformed_packets_raise_value_error(raw):
+    with pytest.raises(ValueError):
+        parse_packet(raw)
@@ -0,0 +1,151 @@
+import json
+import time
+
+import pytest
+
+from ratelimit import *
+
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket()
+    assert bucket.reserve(10**9) == 0
+
+
+def test_bucket_waits_once_burst_is_spent():
+    bucket = TokenBucket(1000)
+    assert bucket.reserve(1000) == 0
+    wait = bucket.reserve(500)
+    assert 0.4 < wait <= 0.5
+
+
+@pytest.mark.parametrize("rate", [0, -1, -1000])
+def test_non_positive_rates_are_rejected(rate):
+    with pytest.raises(ValueError):
+        TokenBucket(rate)
+    with pytest.raises(ValueError):
+        BandwidthScheduler(rate)
+    with pytest.raises(ValueError):
+        BandwidthScheduler(session_rate=rate)
+
+    scheduler = BandwidthScheduler(1000, 1000)
+    with pytest.raises(ValueError):
+        scheduler.set_global_rate(rate)
+    with pytest.raises(ValueError):
+        scheduler.set_session_rate(rate)
+    assert scheduler.global_rate == 1000
+    assert scheduler.session_rate == 1000
+
+
+def test_shared_bucket_matches_plain_bucket():
+    bucket = SharedTokenBucket(1000)
+    assert bucket.rate == 1000
+    assert bucket.reserve(1000) == 0
+    assert bucket.reserve(500) > 0
+    bucket.set_rate(None)
+    assert bucket.rate is None
+    assert bucket.reserve(10**9) == 0
+
+
+def test_session_rate_change_applies_to_running_session():
+    scheduler = BandwidthScheduler()
+    scheduler.add_session("a")
+    scheduler.acquire("a", 10**6)   # unlimited: returns at once
+    scheduler.set_session_rate(2000)
+    scheduler.acquire("a", 100)
+    assert scheduler.sessions["a"]["bucket"].rate == 2000
+
+
+def test_global_rate_ignores_idle_time():
+    scheduler = BandwidthScheduler()
+    time.sleep(0.2)
+    scheduler.add_session("a")
+    scheduler.acquire("a", 1000)
+    time.sleep(0.05)
+    scheduler.remove_session("a")
+    time.sleep(0.2)
+    assert scheduler.rates()["global"] > 1000 / 0.2
+
+
+def test_remove_unknown_session():
+    scheduler = BandwidthScheduler()
+    assert scheduler.remove_session("missing") == 0
+    assert scheduler.rates() == {"global": 0, "sessions": {}}
+
+
+def test_weighted_shares_of_global_rate():
+    scheduler = BandwidthScheduler(40000)
+    scheduler.add_session("a", 1)
+    scheduler.add_session("b", 3)
+    scheduler.acquire("a", 100)
+    scheduler.acquire("b", 100)
+    assert scheduler.sessions["a"]["bucket"].rate == 10000
+    assert scheduler.sessions["b"]["bucket"].rate == 30000
+
+    scheduler.remove_session("b")
+    scheduler.acquire("a", 100)
+    assert scheduler.sessions["a"]["bucket"].rate == 40000
+
+
+def test_share_is_capped_by_session_rate():
+    scheduler = BandwidthScheduler(40000, 5000)
+    scheduler.add_session("a", 1)
+    scheduler.acquire("a", 100)
+    assert scheduler.sessions["a"]["bucket"].rate == 5000
+
+
+def test_weights_are_shared_between_worker_slots():
+    scheduler = BandwidthScheduler(30000, slots=2)
+    scheduler.slot = 0
+    scheduler.add_session("a", 1)
+    scheduler.active_weights[1] = 2   # another worker serving a weight-2 session
+    scheduler.acquire("a", 100)
+    assert scheduler.sessions["a"]["bucket"].rate == 10000
+
+    scheduler.clear_slot(1)   # that worker died
+    scheduler.acquire("a", 100)
+    assert scheduler.sessions["a"]["bucket"].rate == 30000
+
+
+def test_weights_by_host():
+    scheduler = BandwidthScheduler()
+    scheduler.set_weights({"10.0.0.1": 4})
+    assert scheduler.weight_for("10.0.0.1") == 4
+    assert scheduler.weight_for("10.0.0.2") == DEFAULT_WEIGHT
+    with pytest.raises(ValueError):
+        scheduler.set_weights({"10.0.0.1": 0})
+    with pytest.raises(ValueError):
+        scheduler.add_session("a", 0)
+
+
+def test_load_limits(tmp_path):
+    path = tmp_path / "limits.json"
+    path.write_text(json.dumps({"rate": 40000}))
+    assert load_limits(path) == {"rate": 40000}
+
+    path.write_text(json.dumps({"session_rate": None, "weights": {"127.0.0.1": 2.5}}))
+    assert load_limits(path) == {"session_rate": None, "weights": {"127.0.0.1": 2.5}}
+
+
+@pytest.mark.parametrize("config", [
+    {"rate": 0},
+    {"rate": -5},
+    {"rate": "40000"},
+    {"rate": True},
+    {"session_rate": [1]},
+    {"weights": ["127.0.0.1"]},
+    {"weights": {"127.0.0.1": 0}},
+    {"weights": {"127.0.0.1": "2"}},
+    {"rates": 1000},
+    ["x"],
+    "40000",
+    None,
+])
+def test_load_limits_rejects_bad_files(tmp_path, config):
+    path = tmp_path / "limits.json"
+    path.write_text(json.dumps(config))
+    with pytest.raises(ValueError):
+        load_limits(path)
+
+    path.write_text("{not json")
+    with pytest.raises(ValueError):
+        load_limits(path)
@@ -0,0 +1,60 @@
+import pytest
+
+from server import *
+
+
+def test_bind_failure_gives_up():
+    assert plan_restart(EXIT_BIND_FAILED, False, 0.1, 0) == (None, 0)
+    assert plan_restart(EXIT_BIND_FAILED, True, 1000, 0) == (None, 0)
+
+
+def test_backoff_doubles_and_is_capped():
+    failures = 0
+    delays = []
+    for _ in range(20):
+        delay, failures = plan_restart(1, True, 0.1, failures)
+        delays.append(delay)
+    assert delays[:3] == [RESTART_BACKOFF, RESTART_BACKOFF * 2, RESTART_BACKOFF * 4]
+    assert max(delays) == RESTART_BACKOFF_MAX
+
+
+def test_serving_worker_is_never_given_up():
+    failures = 0
+    for _ in range(MAX_STARTUP_FAILURES * 10):
+        delay, failures = plan_restart(1, True, 0.1, failures)
+        assert delay is not None
+
+
+def test_startup_failures_give_up():
+    failures = 0
+    for _ in range(MAX_STARTUP_FAILURES - 1):
+        delay, failures = plan_restart(1, False, 0.1, failures)
+        assert delay is not None
+    delay, failures = plan_restart(1, False, 0.1, failures)
+    assert delay is None
+
+
+def test_long_uptime_resets_backoff():
+    delay, failures = plan_restart(1, True, 0.1, 6)
+    assert delay > RESTART_BACKOFF
+    assert plan_restart(1, True, RESTART_RESET, failures) == (RESTART_BACKOFF, 0)
+
+
+
+def test_reload_keeps_values_missing_from_file(tmp_path):
+    scheduler = BandwidthScheduler(40000)
+    path = tmp_path / "limits.json"
+    path.write_text('{"session_rate": 1000}')
+    reload_limits(scheduler, path)
+    assert scheduler.global_rate == 40000
+    assert scheduler.session_rate == 1000
+
+
+@pytest.mark.parametrize("content", ['["x"]', '{"rate": "40000"}', "{broken"])
+def test_reload_ignores_bad_files(tmp_path, content):
+    scheduler = BandwidthScheduler(40000, 1000)
+    path = tmp_path / "limits.json"
+    path.write_text(content)
+    reload_limits(scheduler, path)
+    assert scheduler.global_rate == 40000
+    assert scheduler.session_rate == 1000